@@ -0,0 +1,77 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from limitador import TokenBucket
+
+# requests-cache opcional (pip install requests-cache): cachea las páginas de
+# Wikipedia (ETag / Last-Modified). Sin él se usa una sesión normal
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
+# Junto al código (no en el cwd), así coincide con /wiki_cache.sqlite del .gitignore
+WIKI_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wiki_cache")
+
+# --------------------------------------------------
+# CONEXIONES HTTP (COMPARTIDO POR scraper.py Y debug.py)
+# --------------------------------------------------
+# Nota: no se usa HTTP/2. La API Express habla HTTP/1.1 en claro (sin h2c) y
+# el tramo de Wikipedia está acotado por WIKI_LIMITER, así que multiplexar no
+# reduciría el tiempo total; keep-alive + hilos ya solapan las esperas.
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                  "AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/123.0.0.0 Safari/537.36"
+}
+
+# Equipos procesados en paralelo por scraper.py y debug.py
+MAX_EQUIPOS_EN_PARALELO = 8
+
+# Límite de requests simultáneos por host (Wikipedia es externo, la API es local)
+WIKI_CONCURRENCIA = 8
+API_CONCURRENCIA = 32
+WIKI_SEM = threading.BoundedSemaphore(WIKI_CONCURRENCIA)
+API_SEM = threading.BoundedSemaphore(API_CONCURRENCIA)
+
+# Timeouts (connect, read): la API local debe conectar casi al instante, así
+# un backend caído falla rápido y los reintentos del adapter no bloquean
+API_TIMEOUT = (1.0, 8.0)
+WIKI_TIMEOUT = (3.05, 20.0)
+
+# Tasa máxima de requests por segundo (token bucket, sin pausas fijas)
+WIKI_LIMITER = TokenBucket(5, 1)
+API_LIMITER = TokenBucket(50, 1)
+
+
+def crear_sesion(pool_maxsize, cache=False):
+    """
+    Crea una sesión keep-alive con reintentos (429/5xx) y un pool de
+    `pool_maxsize` conexiones. Con cache=True (y requests-cache instalado)
+    las re-ejecuciones hacen GET condicionales contra Wikipedia.
+    """
+    if cache and requests_cache is not None:
+        sesion = requests_cache.CachedSession(
+            WIKI_CACHE, backend="sqlite", cache_control=True, expire_after=3600
+        )
+    else:
+        sesion = requests.Session()
+    sesion.headers.update(HEADERS)
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504]),
+    )
+    sesion.mount("http://", adapter)
+    sesion.mount("https://", adapter)
+    return sesion
+
+
+# Dos sesiones: solo la de Wikipedia lleva cache; la API local nunca se cachea
+wiki_session = crear_sesion(WIKI_CONCURRENCIA, cache=True)
+api_session = crear_sesion(API_CONCURRENCIA)
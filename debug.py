@@ -1,109 +1,77 @@
-import requests
-from bs4 import BeautifulSoup
-import time
+import lxml.html
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from conexiones import (
+    API_LIMITER,
+    API_SEM,
+    API_TIMEOUT,
+    MAX_EQUIPOS_EN_PARALELO,
+    WIKI_LIMITER,
+    WIKI_SEM,
+    WIKI_TIMEOUT,
+    api_session,
+    wiki_session,
+)
+from teams import EQUIPOS_CLASIFICADOS, POSICIONES, construir_url_wikipedia
 
 # --------------------------------------------------
 # CONFIGURACIÓN
 # --------------------------------------------------
 API_BASE = "http://localhost:4000/api"
 
-EQUIPOS_CLASIFICADOS = [
-    # Anfitriones
-    {"name": "Canada", "code": "CAN", "confederation": "CONCACAF"},
-    {"name": "Mexico", "code": "MEX", "confederation": "CONCACAF"},
-    {"name": "United States", "code": "USA", "confederation": "CONCACAF"},
-    
-    # UEFA
-    {"name": "England", "code": "ENG", "confederation": "UEFA"},
-    {"name": "France", "code": "FRA", "confederation": "UEFA"},
-    {"name": "Croatia", "code": "CRO", "confederation": "UEFA"},
-    {"name": "Norway", "code": "NOR", "confederation": "UEFA"},
-    {"name": "Portugal", "code": "POR", "confederation": "UEFA"},
-    {"name": "Germany", "code": "GER", "confederation": "UEFA"},
-    {"name": "Netherlands", "code": "NED", "confederation": "UEFA"},
-    {"name": "Switzerland", "code": "SUI", "confederation": "UEFA"},
-    {"name": "Scotland", "code": "SCO", "confederation": "UEFA"},
-    {"name": "Spain", "code": "ESP", "confederation": "UEFA"},
-    {"name": "Austria", "code": "AUT", "confederation": "UEFA"},
-    {"name": "Belgium", "code": "BEL", "confederation": "UEFA"},
-    
-    # CONMEBOL
-    {"name": "Argentina", "code": "ARG", "confederation": "CONMEBOL"},
-    {"name": "Uruguay", "code": "URU", "confederation": "CONMEBOL"},
-    {"name": "Colombia", "code": "COL", "confederation": "CONMEBOL"},
-    {"name": "Brazil", "code": "BRA", "confederation": "CONMEBOL"},
-    {"name": "Ecuador", "code": "ECU", "confederation": "CONMEBOL"},
-    {"name": "Paraguay", "code": "PAR", "confederation": "CONMEBOL"},
-    
-    # AFC
-    {"name": "Japan", "code": "JPN", "confederation": "AFC"},
-    {"name": "Iran", "code": "IRN", "confederation": "AFC"},
-    {"name": "South Korea", "code": "KOR", "confederation": "AFC"},
-    {"name": "Australia", "code": "AUS", "confederation": "AFC"},
-    {"name": "Qatar", "code": "QAT", "confederation": "AFC"},
-    {"name": "Saudi Arabia", "code": "KSA", "confederation": "AFC"},
-    {"name": "Jordan", "code": "JOR", "confederation": "AFC"},
-    {"name": "Uzbekistan", "code": "UZB", "confederation": "AFC"},
-    
-    # CAF
-    {"name": "Morocco", "code": "MAR", "confederation": "CAF"},
-    {"name": "Senegal", "code": "SEN", "confederation": "CAF"},
-    {"name": "Egypt", "code": "EGY", "confederation": "CAF"},
-    {"name": "Algeria", "code": "ALG", "confederation": "CAF"},
-    {"name": "Cameroon", "code": "CMR", "confederation": "CAF"},
-    {"name": "Mali", "code": "MLI", "confederation": "CAF"},
-    {"name": "Ivory Coast", "code": "CIV", "confederation": "CAF"},
-    {"name": "Cape Verde", "code": "CPV", "confederation": "CAF"},
-    {"name": "Nigeria", "code": "NGA", "confederation": "CAF"},
-    
-    # CONCACAF extra
-    {"name": "Panama", "code": "PAN", "confederation": "CONCACAF"},
-    {"name": "Haiti", "code": "HAI", "confederation": "CONCACAF"},
-    {"name": "Curacao", "code": "CUW", "confederation": "CONCACAF"},
-    
-    # OFC
-    {"name": "New Zealand", "code": "NZL", "confederation": "OFC"},
-]
+# XPath: filas de plantilla y primera "wikitable" después de una sección
+_XP_FILAS = '//tr[contains(concat(" ", normalize-space(@class), " "), " nat-fs-player ")]'
+_XP_TABLA_SECCION = (
+    '//span[@id=$sec]/following::table'
+    '[contains(concat(" ", normalize-space(@class), " "), " wikitable ")][1]'
+)
+
+# Parsers de lxml reutilizables (ver parsear_html)
+_parsers_por_hilo = threading.local()
 
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
-}
+# Regex precompilada (una vez por celda): quita "[1]", "(captain)" y "(c)"
+# en una sola pasada
+_RE_LIMPIAR = re.compile(r'\[.*?\]|\(captain\)|\(c\)')
+
+# Posiciones: se quitan los dígitos con str.translate y se busca en teams.POSICIONES
+_SIN_DIGITOS = str.maketrans('', '', '0123456789')
 
-# Sesión Global
-session = requests.Session()
-session.headers.update(HEADERS)
 
 # --------------------------------------------------
 # HELPERS
 # --------------------------------------------------
-def construir_url_wikipedia(nombre_equipo):
-    mapeo_especial = {
-        "United States": "United_States_men's_national_soccer_team",
-        "China": "China_national_football_team"
-    }
-    if nombre_equipo in mapeo_especial:
-        return f"https://en.wikipedia.org/wiki/{mapeo_especial[nombre_equipo]}"
-    
-    nombre_url = nombre_equipo.replace(" ", "_")
-    return f"https://en.wikipedia.org/wiki/{nombre_url}_national_football_team"
-
 def normalizar_posicion(pos_texto):
     if not pos_texto: return "Unknown"
     # Limpiar números ocultos (ej: "1GK" -> "GK")
-    pos_texto = re.sub(r'\d+', '', pos_texto).upper().strip()
-    
-    if "GK" in pos_texto: return "GK"
-    elif any(x in pos_texto for x in ["DF", "CB", "LB", "RB"]): return "DF"
-    elif any(x in pos_texto for x in ["MF", "CM", "CDM", "CAM"]): return "MF"
-    elif any(x in pos_texto for x in ["FW", "ST", "LW", "RW"]): return "FW"
-    return "Unknown"
+    pos_texto = pos_texto.translate(_SIN_DIGITOS).upper().strip()
+    return POSICIONES.get(pos_texto, "Unknown")
+
+def parsear_html(resp):
+    # Alimenta a lxml bloque a bloque: sin copia completa de resp.content ni resp.text.
+    # El parser se reutiliza entre páginas (uno por hilo y encoding: lxml no
+    # permite compartir un parser entre hilos)
+    if not hasattr(_parsers_por_hilo, "parsers"):
+        _parsers_por_hilo.parsers = {}
+    parsers = _parsers_por_hilo.parsers
+    parser = parsers.get(resp.encoding)
+    if parser is None:
+        parser = parsers[resp.encoding] = lxml.html.HTMLParser(recover=True, encoding=resp.encoding)
+
+    try:
+        for bloque in resp.iter_content(chunk_size=64 * 1024):
+            parser.feed(bloque)
+        return parser.close()
+    except Exception:
+        # Un parser que falló a mitad de documento no se vuelve a usar
+        parsers.pop(resp.encoding, None)
+        raise
 
 def limpiar_texto(texto):
     if not texto: return ""
-    texto = re.sub(r'\[.*?\]', '', texto) # Quitar [1]
-    texto = texto.replace("(captain)", "").replace("(c)", "")
-    return texto.strip()
+    return _RE_LIMPIAR.sub('', texto).strip() # Quitar [1], (captain), (c)
 
 # --------------------------------------------------
 # FUNCIONES PRINCIPALES
@@ -111,7 +79,8 @@ def limpiar_texto(texto):
 def crear_equipo_en_api(team):
     payload = {"name": team["name"], "code": team["code"], "confederation": team["confederation"]}
     try:
-        resp = session.post(f"{API_BASE}/teams", json=payload, timeout=10)
+        with API_SEM, API_LIMITER:
+            resp = api_session.post(f"{API_BASE}/teams", json=payload, timeout=API_TIMEOUT)
         if resp.status_code in (200, 201):
             data = resp.json()
             # Soporte para devolver _id o id
@@ -120,54 +89,59 @@ def crear_equipo_en_api(team):
         pass
     return None
 
-def scrapear_y_guardar_jugadores(team, team_id):
+def scrapear_jugadores(team, log):
     wiki_url = construir_url_wikipedia(team["name"])
-    print(f"   🔍 {team['name']}: {wiki_url}")
+    log.append(f"   🔍 {team['name']}: {wiki_url}")
     
     try:
-        resp = session.get(wiki_url, timeout=20)
+        # stream=True: el HTML se parsea por bloques mientras se descarga
+        with WIKI_SEM, WIKI_LIMITER, wiki_session.get(wiki_url, stream=True, timeout=WIKI_TIMEOUT) as resp:
+            # Página inexistente o error del servidor: no vale la pena parsearla
+            if resp.status_code != 200:
+                log.append(f"   ❌ Wikipedia respondió {resp.status_code}")
+                return []
+            doc = parsear_html(resp)
     except Exception:
-        return 0
-
-    soup = BeautifulSoup(resp.text, "html.parser")
+        return []
     
     # 1. BUSCAR LA CLASE EXACTA QUE VIMOS EN TU DEBUG
-    filas = soup.find_all("tr", class_="nat-fs-player")
+    filas = doc.xpath(_XP_FILAS)
 
     # Fallback si no encuentra esa clase (para equipos con tablas viejas)
     if not filas:
         sectores = ["Current_squad", "Squad", "Players"]
         for sec in sectores:
-            span = soup.find("span", id=sec)
-            if span:
-                tabla = span.find_next("table", class_="wikitable")
-                if tabla:
-                    filas = tabla.find_all("tr")[1:]
-                    break
+            tablas = doc.xpath(_XP_TABLA_SECCION, sec=sec)
+            if tablas:
+                filas = tablas[0].xpath(".//tr")[1:]
+                break
     
     if not filas:
-        print("   ⚠️ No se encontraron jugadores.")
-        return 0
+        log.append("   ⚠️ No se encontraron jugadores.")
+        return []
 
-    guardados = 0
-    errores = 0
+    jugadores = []
 
     for fila in filas:
         try:
             # ---------------------------------------------------
             # AQUÍ ESTÁ LA MAGIA BASADA EN TU DEBUG
             # ---------------------------------------------------
-            
+            # Una sola pasada por fila: el TH (nombre) y todos los TD
+            celdas_th = fila.xpath("./th")
+            celdas_td = fila.xpath("./td")
+            if not celdas_td: continue
+
             # 1. NOMBRE: Tu debug dice que es Columna 2 y es un <TH>
-            celda_nombre = fila.find("th") # Buscamos el único TH de la fila
-            if not celda_nombre:
+            if celdas_th:
+                celda_nombre = celdas_th[0] # Buscamos el único TH de la fila
+            elif len(celdas_td) > 2:
                 # Si no hay TH, intentamos buscar el TD con enlace (caso raro)
-                celdas = fila.find_all("td")
-                if len(celdas) > 2: celda_nombre = celdas[2] # Fallback índice 2
-            
-            if not celda_nombre: continue
+                celda_nombre = celdas_td[2] # Fallback índice 2
+            else:
+                continue
 
-            nombre = celda_nombre.get_text(strip=True)
+            nombre = celda_nombre.text_content()
             # Limpieza extra: a veces viene el texto "(captain)" pegado
             nombre = limpiar_texto(nombre)
 
@@ -175,47 +149,74 @@ def scrapear_y_guardar_jugadores(team, team_id):
             if nombre.startswith("(") or "age" in nombre: continue
             
             # 2. RESTO DE DATOS (TDs)
-            celdas_td = fila.find_all("td")
-            if not celdas_td: continue
-
             # NUMERO (Columna 0 en tu debug)
-            num = celdas_td[0].get_text(strip=True)
+            num = celdas_td[0].text_content().strip()
             
             # POSICION (Columna 1 en tu debug: "1GK")
-            pos_raw = celdas_td[1].get_text(strip=True)
+            pos_raw = celdas_td[1].text_content()
             pos_norm = normalizar_posicion(pos_raw) # Esto limpiará el "1"
 
             # CLUB (Ultima columna)
-            club = celdas_td[-1].get_text(strip=True)
-            club = limpiar_texto(club)
+            club = limpiar_texto(celdas_td[-1].text_content())
 
             # ---------------------------------------------------
             # GUARDAR
             # ---------------------------------------------------
-            payload = {
+            jugadores.append({
                 "name": nombre,
                 "position": pos_norm,
                 "club": club,
-                "teamId": team_id,
-                "shirtNumber": num if num.isdigit() else None,
+                "number": int(num) if num.isdigit() else None,
                 "photo": None
-            }
-
-            r = session.post(f"{API_BASE}/players", json=payload, timeout=5)
-            
-            if r.status_code in (200, 201):
-                guardados += 1
-                if guardados <= 3:
-                    print(f"      ✓ {nombre} ({pos_norm}) - {club}")
-            else:
-                errores += 1
+            })
 
         except Exception:
             continue
 
-    print(f"   🎉 {guardados} jugadores guardados.")
+    return jugadores
+
+def guardar_jugadores(team_id, jugadores, log):
+    if not jugadores: return 0
+    guardados = 0
+
+    # Un solo POST por equipo con toda la plantilla
+    try:
+        with API_SEM, API_LIMITER:
+            r = api_session.post(
+                f"{API_BASE}/players/bulk",
+                json={"teamId": team_id, "players": jugadores},
+                timeout=API_TIMEOUT,
+            )
+        if r.status_code in (200, 201):
+            data = r.json()
+            guardados = data.get("saved", 0)
+            # La API puede responder 201 y aun así rechazar algunos jugadores
+            rechazados = {err.get("name") for err in data.get("errors") or []}
+            for j in [j for j in jugadores if j["name"] not in rechazados][:3]:
+                log.append(f"      ✓ {j['name']} ({j['position']}) - {j['club']}")
+    except Exception:
+        pass
+
+    log.append(f"   🎉 {guardados} jugadores guardados.")
     return guardados
 
+def procesar_equipo(team, pool_wiki):
+    # Las líneas de cada equipo se juntan en `log` y main las imprime de una
+    # vez, así no se mezclan con las de otros hilos
+    log = ["-" * 50, f"🏴 Procesando: {team['name']}"]
+
+    # Wikipedia se descarga/parsea mientras se crea el equipo en la API
+    log_wiki = []
+    futuro_jugadores = pool_wiki.submit(scrapear_jugadores, team, log_wiki)
+
+    tid = crear_equipo_en_api(team)
+    if not tid:
+        futuro_jugadores.cancel()
+        return 0, log
+    jugadores = futuro_jugadores.result()
+    log.extend(log_wiki)
+    return guardar_jugadores(tid, jugadores, log), log
+
 # --------------------------------------------------
 # MAIN
 # --------------------------------------------------
@@ -224,21 +225,17 @@ def main():
     
     # Check conexión simple
     try:
-        session.get(API_BASE.replace("/api", ""), timeout=3)
+        api_session.get(API_BASE.replace("/api", ""), timeout=API_TIMEOUT)
     except:
         print("❌ Error: No se detecta el backend en localhost:4000")
         return
 
-    total = 0
-    for team in EQUIPOS_CLASIFICADOS:
-        print("-" * 50)
-        print(f"🏴 Procesando: {team['name']}")
-        
-        tid = crear_equipo_en_api(team)
-        if tid:
-            total += scrapear_y_guardar_jugadores(team, tid)
-        
-        time.sleep(1) # Pausa ética
+    with ThreadPoolExecutor(max_workers=MAX_EQUIPOS_EN_PARALELO) as pool, \
+            ThreadPoolExecutor(max_workers=MAX_EQUIPOS_EN_PARALELO) as pool_wiki:
+        total = 0
+        for guardados, log in pool.map(partial(procesar_equipo, pool_wiki=pool_wiki), EQUIPOS_CLASIFICADOS):
+            print("\n".join(log))
+            total += guardados
 
     print("\n" + "="*50)
     print(f"✅ FINALIZADO. Total jugadores: {total}")
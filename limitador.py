@@ -0,0 +1,50 @@
+import threading
+import time
+
+
+# --------------------------------------------------
+# LIMITADOR DE TASA (TOKEN BUCKET)
+# --------------------------------------------------
+class TokenBucket:
+    """
+    Limitador token-bucket seguro entre hilos.
+    Permite hasta `max_rate` requests por cada `time_period` segundos y solo
+    duerme cuando se agotan los tokens (no hay pausa fija entre requests).
+
+    Uso:
+        with limitador:
+            session.get(...)
+    """
+
+    def __init__(self, max_rate, time_period=1.0):
+        self.max_rate = max_rate
+        self._tasa = max_rate / time_period  # tokens por segundo
+        self._tokens = float(max_rate)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def adquirir(self):
+        """Bloquea hasta que haya un token disponible y lo consume."""
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                self._tokens = min(
+                    self.max_rate,
+                    self._tokens + (ahora - self._ultimo) * self._tasa,
+                )
+                self._ultimo = ahora
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                espera = (1 - self._tokens) / self._tasa
+
+            time.sleep(espera)
+
+    def __enter__(self):
+        self.adquirir()
+        return self
+
+    def __exit__(self, *exc):
+        return False
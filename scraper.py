@@ -1,112 +1,50 @@
-import requests
-from bs4 import BeautifulSoup
-import time
+from bs4 import BeautifulSoup, SoupStrainer
+import os
+import shelve
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from conexiones import (
+    API_LIMITER,
+    API_SEM,
+    API_TIMEOUT,
+    MAX_EQUIPOS_EN_PARALELO,
+    WIKI_LIMITER,
+    WIKI_SEM,
+    WIKI_TIMEOUT,
+    api_session,
+    wiki_session,
+)
+from teams import EQUIPOS_CLASIFICADOS, POSICIONES, construir_url_wikipedia
 
 # --------------------------------------------------
 # CONFIGURACIÓN
 # --------------------------------------------------
 API_BASE = "http://localhost:4000/api"
 
-# Equipos clasificados manualmente (basados en información actualizada)
-EQUIPOS_CLASIFICADOS = [
-    # Anfitriones (automáticos)
-    {"name": "Canada", "code": "CAN", "confederation": "CONCACAF"},
-    {"name": "Mexico", "code": "MEX", "confederation": "CONCACAF"},
-    {"name": "United States", "code": "USA", "confederation": "CONCACAF"},
-    
-    # UEFA (Europa) - 12 clasificados
-    {"name": "England", "code": "ENG", "confederation": "UEFA"},
-    {"name": "France", "code": "FRA", "confederation": "UEFA"},
-    {"name": "Croatia", "code": "CRO", "confederation": "UEFA"},
-    {"name": "Norway", "code": "NOR", "confederation": "UEFA"},
-    {"name": "Portugal", "code": "POR", "confederation": "UEFA"},
-    {"name": "Germany", "code": "GER", "confederation": "UEFA"},
-    {"name": "Netherlands", "code": "NED", "confederation": "UEFA"},
-    {"name": "Switzerland", "code": "SUI", "confederation": "UEFA"},
-    {"name": "Scotland", "code": "SCO", "confederation": "UEFA"},
-    {"name": "Spain", "code": "ESP", "confederation": "UEFA"},
-    {"name": "Austria", "code": "AUT", "confederation": "UEFA"},
-    {"name": "Belgium", "code": "BEL", "confederation": "UEFA"},
-    
-    # CONMEBOL (Sudamérica) - 6 clasificados
-    {"name": "Argentina", "code": "ARG", "confederation": "CONMEBOL"},
-    {"name": "Uruguay", "code": "URU", "confederation": "CONMEBOL"},
-    {"name": "Colombia", "code": "COL", "confederation": "CONMEBOL"},
-    {"name": "Brazil", "code": "BRA", "confederation": "CONMEBOL"},
-    {"name": "Ecuador", "code": "ECU", "confederation": "CONMEBOL"},
-    {"name": "Paraguay", "code": "PAR", "confederation": "CONMEBOL"},
-    
-    # AFC (Asia) - 8 clasificados
-    {"name": "Japan", "code": "JPN", "confederation": "AFC"},
-    {"name": "Iran", "code": "IRN", "confederation": "AFC"},
-    {"name": "South Korea", "code": "KOR", "confederation": "AFC"},
-    {"name": "Australia", "code": "AUS", "confederation": "AFC"},
-    {"name": "Qatar", "code": "QAT", "confederation": "AFC"},
-    {"name": "Saudi Arabia", "code": "KSA", "confederation": "AFC"},
-    {"name": "Jordan", "code": "JOR", "confederation": "AFC"},
-    {"name": "Uzbekistan", "code": "UZB", "confederation": "AFC"},
-    
-    # CAF (África) - 9 clasificados
-    {"name": "Morocco", "code": "MAR", "confederation": "CAF"},
-    {"name": "Senegal", "code": "SEN", "confederation": "CAF"},
-    {"name": "Egypt", "code": "EGY", "confederation": "CAF"},
-    {"name": "Algeria", "code": "ALG", "confederation": "CAF"},
-    {"name": "Cameroon", "code": "CMR", "confederation": "CAF"},
-    {"name": "Mali", "code": "MLI", "confederation": "CAF"},
-    {"name": "Ivory Coast", "code": "CIV", "confederation": "CAF"},
-    {"name": "Cape Verde", "code": "CPV", "confederation": "CAF"},
-    {"name": "Nigeria", "code": "NGA", "confederation": "CAF"},
-    
-    # CONCACAF - 3 clasificados adicionales (anfitriones aparte)
-    {"name": "Panama", "code": "PAN", "confederation": "CONCACAF"},
-    {"name": "Haiti", "code": "HAI", "confederation": "CONCACAF"},
-    {"name": "Curacao", "code": "CUW", "confederation": "CONCACAF"},
-    
-    # OFC (Oceanía) - 1 clasificado
-    {"name": "New Zealand", "code": "NZL", "confederation": "OFC"},
-]
+# Solo construimos el DOM de las etiquetas que realmente usamos
+SOLO_TABLAS = SoupStrainer(["table", "span"])
 
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                  "AppleWebKit/537.36 (KHTML, like Gecko) "
-                  "Chrome/123.0.0.0 Safari/537.36"
-}
+# API de MediaWiki (fotos de jugadores en lote)
+WIKI_API = "https://en.wikipedia.org/w/api.php"
+TAMANO_LOTE_FOTOS = 50
 
-
-# --------------------------------------------------
-# HELPERS DE WIKIPEDIA
-# --------------------------------------------------
-def construir_url_wikipedia(nombre_equipo):
-    """
-    Construye la URL de Wikipedia para el equipo nacional.
-    Maneja algunos casos especiales como Estados Unidos, NZ, etc.
-    """
-    mapeo_especial = {
-        "United States": "United_States_men's_national_soccer_team",
-        "England": "England_national_football_team",
-        "Scotland": "Scotland_national_football_team",
-        "Northern Ireland": "Northern_Ireland_national_football_team",
-        "Wales": "Wales_national_football_team",
-        "South Korea": "South_Korea_national_football_team",
-        "Ivory Coast": "Ivory_Coast_national_football_team",
-        "Cape Verde": "Cape_Verde_national_football_team",
-        "Saudi Arabia": "Saudi_Arabia_national_football_team",
-        "New Zealand": "New_Zealand_men's_national_football_team",
-    }
-    
-    if nombre_equipo in mapeo_especial:
-        return f"https://en.wikipedia.org/wiki/{mapeo_especial[nombre_equipo]}"
-    
-    nombre_url = nombre_equipo.replace(" ", "_")
-    return f"https://en.wikipedia.org/wiki/{nombre_url}_national_football_team"
+# Memo de fotos {nombre: url o None}: en memoria durante la ejecución y
+# persistido con shelve entre ejecuciones. Solo se persisten las fotos
+# encontradas: un "sin foto" se vuelve a consultar en la próxima ejecución.
+# El archivo va junto al código (no en el cwd), como indica el .gitignore
+FOTOS_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "foto_cache")
+_fotos_memo = None
+_fotos_lock = threading.Lock()
 
 
 # --------------------------------------------------
 # API: CREAR EQUIPO
 # --------------------------------------------------
-def crear_equipo_en_api(team):
+def crear_equipo_en_api(team, log):
     """
     Envía el equipo a tu API /api/teams y devuelve el _id del equipo.
+    Los mensajes se agregan a `log` (ver procesar_equipo).
     """
     payload = {
         "name": team["name"],
@@ -115,31 +53,32 @@ def crear_equipo_en_api(team):
     }
 
     try:
-        resp = requests.post(f"{API_BASE}/teams", json=payload, timeout=10)
+        with API_SEM, API_LIMITER:
+            resp = api_session.post(f"{API_BASE}/teams", json=payload, timeout=API_TIMEOUT)
     except Exception as e:
-        print(f"❌ Error conectando a la API para {team['name']}:", e)
+        log.append(f"❌ Error conectando a la API para {team['name']}: {e}")
         return None
 
     if resp.status_code not in (200, 201):
-        print(f"❌ Error creando equipo {team['name']}: {resp.status_code}")
+        log.append(f"❌ Error creando equipo {team['name']}: {resp.status_code}")
         try:
-            print(f"   Respuesta: {resp.json()}")
+            log.append(f"   Respuesta: {resp.json()}")
         except Exception:
-            print(f"   Respuesta: {resp.text[:200]}")
+            log.append(f"   Respuesta: {resp.text[:200]}")
         return None
 
     try:
         data = resp.json()
     except Exception:
-        print(f"❌ No se pudo parsear JSON para {team['name']}")
+        log.append(f"❌ No se pudo parsear JSON para {team['name']}")
         return None
 
     team_id = data.get("_id") or data.get("id")
     if not team_id:
-        print(f"❌ La respuesta no trae _id para {team['name']}")
+        log.append(f"❌ La respuesta no trae _id para {team['name']}")
         return None
 
-    print(f"✅ Equipo {team['name']} creado. ID: {team_id}")
+    log.append(f"✅ Equipo {team['name']} creado. ID: {team_id}")
     return team_id
 
 
@@ -150,93 +89,121 @@ def normalizar_posicion(pos_texto):
     """
     Normaliza las posiciones a los valores permitidos: GK, DF, MF, FW, Unknown
     """
-    pos_texto = pos_texto.upper().strip()
-    
-    if pos_texto in ["GK", "GOALKEEPER"]:
-        return "GK"
-    elif pos_texto in ["DF", "DEF", "DEFENDER", "CB", "LB", "RB", "LWB", "RWB"]:
-        return "DF"
-    elif pos_texto in ["MF", "MID", "MIDFIELDER", "CM", "DM", "AM", "CDM", "CAM"]:
-        return "MF"
-    elif pos_texto in ["FW", "FOR", "FORWARD", "ST", "CF", "LW", "RW", "ATT", "STRIKER"]:
-        return "FW"
-    else:
-        return "Unknown"
+    return POSICIONES.get(pos_texto.upper().strip(), "Unknown")
 
 
 # --------------------------------------------------
-# OBTENER FOTO DEL JUGADOR (OPCIONAL)
+# OBTENER FOTOS DE JUGADORES (OPCIONAL)
 # --------------------------------------------------
-def obtener_foto_jugador(nombre_jugador):
+def obtener_fotos_jugadores(nombres, log):
     """
-    Busca la foto del jugador en su página de Wikipedia.
-    Retorna la URL de la imagen o None si no se encuentra.
+    Busca las fotos de varios jugadores con la API de MediaWiki
+    (prop=pageimages), pidiendo hasta 50 títulos por request.
+    Retorna un dict {nombre: url_imagen o None}.
+    Solo consulta los nombres que no estén ya en el memo de fotos.
     """
-    try:
-        nombre_url = nombre_jugador.replace(" ", "_")
-        url = f"https://en.wikipedia.org/wiki/{nombre_url}"
-        
-        resp = requests.get(url, headers=HEADERS, timeout=10)
-        time.sleep(0.5)  # Pausa breve para no abusar
-        
-        if resp.status_code != 200:
-            return None
-        
-        soup = BeautifulSoup(resp.text, "html.parser")
-        
-        # Buscar la imagen en el infobox (caja lateral)
-        infobox = soup.find("table", class_="infobox")
-        if infobox:
-            img = infobox.find("img")
-            if img and img.get("src"):
-                img_url = img.get("src")
-                if img_url.startswith("//"):
-                    img_url = "https:" + img_url
-                return img_url
-        
-        # Fallback: primera imagen "decente"
-        images = soup.find_all("img")
-        for img in images:
-            src = img.get("src", "")
-            if "upload.wikimedia.org" in src and not any(
-                x in src for x in ["icon", "logo", "flag", "20px", "15px"]
-            ):
-                if src.startswith("//"):
-                    src = "https:" + src
-                return src
-        
-        return None
-    except Exception:
-        return None
+    with _fotos_lock:
+        memo = _cargar_memo_fotos()
+        fotos = {nombre: memo[nombre] for nombre in nombres if nombre in memo}
+
+    pendientes = list(dict.fromkeys(n for n in nombres if n not in fotos))
+    nuevas = {}
+    for inicio in range(0, len(pendientes), TAMANO_LOTE_FOTOS):
+        lote = pendientes[inicio:inicio + TAMANO_LOTE_FOTOS]
+        params = {
+            "action": "query",
+            "format": "json",
+            "formatversion": 2,
+            "prop": "pageimages",
+            "piprop": "thumbnail",
+            "pithumbsize": 200,
+            "redirects": 1,
+            "titles": "|".join(lote),
+        }
+
+        try:
+            with WIKI_SEM, WIKI_LIMITER:
+                resp = wiki_session.get(WIKI_API, params=params, timeout=WIKI_TIMEOUT)
+            resp.raise_for_status()
+            query = resp.json().get("query", {})
+        except Exception:
+            continue
+
+        # La API normaliza títulos y sigue redirecciones: "from" -> "to"
+        alias = {
+            cambio["from"]: cambio["to"]
+            for cambio in query.get("normalized", []) + query.get("redirects", [])
+        }
+        por_titulo = {
+            page["title"]: page.get("thumbnail", {}).get("source")
+            for page in query.get("pages", [])
+        }
+
+        for nombre in lote:
+            titulo = alias.get(nombre, nombre)
+            titulo = alias.get(titulo, titulo)
+            nuevas[nombre] = por_titulo.get(titulo)
+
+    # Solo se memorizan los lotes que respondieron (un error no queda cacheado)
+    if nuevas:
+        with _fotos_lock:
+            _fotos_memo.update(nuevas)
+            try:
+                with shelve.open(FOTOS_CACHE) as db:
+                    db.update({n: url for n, url in nuevas.items() if url})
+            except Exception as e:
+                log.append(f"   ⚠️ No se pudo guardar el cache de fotos: {e}")
+
+    fotos.update(nuevas)
+    return fotos
+
+
+def _cargar_memo_fotos():
+    """
+    Carga (una sola vez) el cache de fotos de ejecuciones anteriores.
+    Debe llamarse con _fotos_lock tomado.
+    """
+    global _fotos_memo
+    if _fotos_memo is None:
+        try:
+            with shelve.open(FOTOS_CACHE, flag="r") as db:
+                # Ignora "sin foto" guardados por versiones anteriores
+                _fotos_memo = {nombre: url for nombre, url in db.items() if url}
+        except Exception:
+            _fotos_memo = {}  # primera ejecución: aún no existe el archivo
+    return _fotos_memo
 
 
 # --------------------------------------------------
 # SCRAPING DE JUGADORES (CON CURRENT SQUAD)
 # --------------------------------------------------
-def scrapear_y_guardar_jugadores(team, team_id):
+def scrapear_jugadores(team, log):
     """
     Entra a la página de la selección en Wikipedia y, si existe,
     usa la sección 'Current squad' para sacar la plantilla actual.
     Si no encuentra esa sección, cae a una tabla genérica de jugadores.
+    Devuelve la lista de jugadores (con foto) lista para enviar a la API;
+    los mensajes se agregan a `log`.
     """
     wiki_url = construir_url_wikipedia(team["name"])
-    print(f"   🔍 Scrapeando plantilla de {team['name']} en: {wiki_url}")
+    log.append(f"   🔍 Scrapeando plantilla de {team['name']} en: {wiki_url}")
     
     try:
-        resp = requests.get(wiki_url, headers=HEADERS, timeout=20)
+        with WIKI_SEM, WIKI_LIMITER:
+            resp = wiki_session.get(wiki_url, timeout=WIKI_TIMEOUT)
         resp.raise_for_status()
     except Exception as e:
-        print(f"   ❌ Error en request a Wikipedia: {e}")
-        return 0
+        log.append(f"   ❌ Error en request a Wikipedia: {e}")
+        return []
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    soup = BeautifulSoup(resp.content, "lxml", parse_only=SOLO_TABLAS)
 
     # 1) Intentar sección "Current squad"
     tabla = None
     span_current = soup.find("span", id="Current_squad")
     if span_current:
-        h3_current = span_current.parent  # normalmente <h3>
-        tabla = h3_current.find_next("table", class_="wikitable")
+        # Con SoupStrainer el <h3> padre no se construye: buscamos desde el span
+        tabla = span_current.find_next("table", class_="wikitable")
 
     # 2) Fallback genérico si no encontramos "Current squad"
     if tabla is None:
@@ -245,15 +212,15 @@ def scrapear_y_guardar_jugadores(team, team_id):
             header_line = " ".join(headers)
             if ("player" in header_line or "name" in header_line) and "club" in header_line:
                 tabla = t
-                print("   ℹ️ Usando tabla genérica de jugadores (sin Current squad).")
+                log.append("   ℹ️ Usando tabla genérica de jugadores (sin Current squad).")
                 break
 
     if tabla is None:
-        print("   ⚠️ No se encontró tabla de jugadores (Current squad ni genérica).")
-        return 0
+        log.append("   ⚠️ No se encontró tabla de jugadores (Current squad ni genérica).")
+        return []
 
-    guardados = 0
     errores = 0
+    jugadores = []
     filas = tabla.find_all("tr")[1:]  # saltar encabezado
 
     for fila in filas:
@@ -293,46 +260,114 @@ def scrapear_y_guardar_jugadores(team, team_id):
             club = club.split("[")[0].strip()
 
             pos_norm = normalizar_posicion(pos_raw) if pos_raw else "Unknown"
-            foto_url = obtener_foto_jugador(nombre)
 
-            payload_jugador = {
+            jugadores.append({
                 "name": nombre,
                 "position": pos_norm,
                 "club": club or "Unknown",
-                "teamId": team_id,
-                "shirtNumber": num_raw if num_raw else None,
-                "photo": foto_url,
-            }
-
-            r = requests.post(f"{API_BASE}/players", json=payload_jugador, timeout=10)
-            time.sleep(0.2)
-
-            if r.status_code not in (200, 201):
-                errores += 1
-                if errores <= 3:
-                    print(
-                        f"      ⚠️ Error guardando {nombre}: "
-                        f"{r.status_code} {r.text[:120]}"
-                    )
-                continue
-
-            guardados += 1
-            icon = "📷" if foto_url else "👤"
-            if guardados <= 10 or guardados % 5 == 0:
-                print(f"      ✓ {icon} {nombre} ({pos_norm}, {club})")
+                "number": int(num_raw) if num_raw.isdigit() else None,
+                "photo": None,
+            })
 
         except Exception as e:
             errores += 1
             if errores <= 3:
-                print(f"      ⚠️ Error procesando fila: {e}")
+                log.append(f"      ⚠️ Error procesando fila: {e}")
             continue
 
-    print(f"   🎉 {guardados} jugadores guardados para {team['name']}")
+    # Una sola consulta (por cada 50 jugadores) para todas las fotos del equipo
+    fotos = obtener_fotos_jugadores([j["name"] for j in jugadores], log)
+
+    for payload_jugador in jugadores:
+        payload_jugador["photo"] = fotos.get(payload_jugador["name"])
+
     if errores > 3:
-        print(f"      ({errores} filas con error)")
+        log.append(f"      ({errores} filas con error)")
+    return jugadores
+
+
+# --------------------------------------------------
+# API: GUARDAR PLANTILLA
+# --------------------------------------------------
+def guardar_jugadores_en_api(team, team_id, jugadores, log):
+    """
+    Envía la plantilla completa a /api/players/bulk y devuelve
+    cuántos jugadores guardó la API.
+    """
+    if not jugadores:
+        return 0
+
+    # Un solo POST por equipo con toda la plantilla
+    try:
+        with API_SEM, API_LIMITER:
+            r = api_session.post(
+                f"{API_BASE}/players/bulk",
+                json={"teamId": team_id, "players": jugadores},
+                timeout=API_TIMEOUT,
+            )
+    except Exception as e:
+        log.append(f"   ❌ Error guardando jugadores de {team['name']}: {e}")
+        return 0
+
+    if r.status_code not in (200, 201):
+        log.append(
+            f"   ❌ Error guardando jugadores de {team['name']}: "
+            f"{r.status_code} {r.text[:120]}"
+        )
+        return 0
+
+    data = r.json()
+    guardados = data.get("saved", 0)
+    rechazados = data.get("errors") or []
+    for err in rechazados[:3]:
+        log.append(f"      ⚠️ Error guardando {err.get('name')}: {err.get('error')}")
+
+    nombres_rechazados = {err.get("name") for err in rechazados}
+    for j in [j for j in jugadores if j["name"] not in nombres_rechazados][:10]:
+        icon = "📷" if j["photo"] else "👤"
+        log.append(f"      ✓ {icon} {j['name']} ({j['position']}, {j['club']})")
+
+    log.append(f"   🎉 {guardados} jugadores guardados para {team['name']}")
+    if len(rechazados) > 3:
+        log.append(f"      ({len(rechazados)} jugadores rechazados por la API)")
     return guardados
 
 
+# --------------------------------------------------
+# PROCESAR UN EQUIPO (SE EJECUTA EN UN HILO DEL POOL)
+# --------------------------------------------------
+def procesar_equipo(i, total_equipos, team, pool_wiki):
+    """
+    Crea el equipo en la API y scrapea su plantilla.
+    El scraping de Wikipedia corre en `pool_wiki` mientras se crea el equipo,
+    así ambas esperas de red se solapan.
+    Devuelve (team_id, jugadores_guardados, log); team_id es None si falló la
+    API y `log` son las líneas de salida del equipo, que main imprime juntas
+    para que no se mezclen con las de otros hilos.
+    """
+    log = [
+        "=" * 60,
+        f"[{i}/{total_equipos}] 🏴 {team['name']} ({team['code']})",
+        "=" * 60,
+    ]
+
+    # El hilo de Wikipedia escribe en su propia lista (se une al terminar)
+    log_wiki = []
+    futuro_jugadores = pool_wiki.submit(scrapear_jugadores, team, log_wiki)
+
+    team_id = crear_equipo_en_api(team, log)
+    if not team_id:
+        futuro_jugadores.cancel()
+        log.append("   ⏭ Saltando jugadores\n")
+        return None, 0, log
+
+    jugadores = futuro_jugadores.result()
+    log.extend(log_wiki)
+    jugadores_guardados = guardar_jugadores_en_api(team, team_id, jugadores, log)
+    log.append("")  # Línea en blanco
+    return team_id, jugadores_guardados, log
+
+
 # --------------------------------------------------
 # MAIN
 # --------------------------------------------------
@@ -344,7 +379,7 @@ def main():
     # Verificar conexión con la API (raíz del servidor)
     try:
         base_sin_api = API_BASE.replace("/api", "")
-        resp = requests.get(f"{base_sin_api}/", timeout=5)
+        resp = api_session.get(f"{base_sin_api}/", timeout=API_TIMEOUT)
         if resp.status_code == 200:
             print("✅ Conexión con API establecida\n")
         else:
@@ -360,26 +395,24 @@ def main():
     equipos_exitosos = 0
     equipos_con_jugadores = 0
 
-    for i, team in enumerate(EQUIPOS_CLASIFICADOS, 1):
-        print("=" * 60)
-        print(f"[{i}/{len(EQUIPOS_CLASIFICADOS)}] 🏴 {team['name']} ({team['code']})")
-        print("=" * 60)
-
-        team_id = crear_equipo_en_api(team)
-        if not team_id:
-            print("   ⏭ Saltando jugadores\n")
-            continue
+    total_equipos = len(EQUIPOS_CLASIFICADOS)
+    with ThreadPoolExecutor(max_workers=MAX_EQUIPOS_EN_PARALELO) as pool, \
+            ThreadPoolExecutor(max_workers=MAX_EQUIPOS_EN_PARALELO) as pool_wiki:
+        futuros = [
+            pool.submit(procesar_equipo, i, total_equipos, team, pool_wiki)
+            for i, team in enumerate(EQUIPOS_CLASIFICADOS, 1)
+        ]
+        # En orden de envío: los bloques [i/N] salen en secuencia
+        for futuro in futuros:
+            team_id, jugadores_guardados, log = futuro.result()
+            print("\n".join(log))
+            if not team_id:
+                continue
 
-        equipos_exitosos += 1
-        jugadores_guardados = scrapear_y_guardar_jugadores(team, team_id)
-        
-        if jugadores_guardados > 0:
-            equipos_con_jugadores += 1
-            total_jugadores += jugadores_guardados
-        
-        print()  # Línea en blanco
-        if i < len(EQUIPOS_CLASIFICADOS):
-            time.sleep(2)
+            equipos_exitosos += 1
+            if jugadores_guardados > 0:
+                equipos_con_jugadores += 1
+                total_jugadores += jugadores_guardados
 
     print("=" * 60)
     print("✅ PROCESO FINALIZADO")
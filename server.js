@@ -616,6 +616,7 @@ app.get("/", (req, res) => {
       players: {
         list: "GET /api/players",
         create: "POST /api/players",
+        bulk: "POST /api/players/bulk",
         detail: "GET /api/players/:id",
         update: "PUT /api/players/:id",
         delete: "DELETE /api/players/:id",
@@ -847,6 +848,83 @@ app.post("/api/players", async (req, res) => {
   }
 });
 
+// Bulk: una plantilla completa en un solo request (usado por los scrapers)
+app.post("/api/players/bulk", async (req, res) => {
+  try {
+    const { teamId, players } = req.body;
+    if (!teamId || !Array.isArray(players)) {
+      return res.status(400).json({ error: "teamId y players (array) son obligatorios" });
+    }
+
+    const teamExists = await Team.findById(teamId);
+    if (!teamExists) return res.status(404).json({ error: "Equipo no encontrado" });
+
+    // Todo jugador descartado queda en errors: saved + errors.length === total
+    const errors = [];
+    const docs = players
+      .filter((p) => {
+        if (p && p.name) return true;
+        errors.push({ name: p?.name, error: "name es obligatorio" });
+        return false;
+      })
+      .map(({ name, position, number, club, age, photo }) => ({
+        name,
+        position: position || "Unknown",
+        number,
+        club: club || "Unknown",
+        age,
+        photo,
+        team: teamId,
+      }));
+
+    // Validación previa por documento: insertMany con ordered:false descarta
+    // en silencio los que no pasan el schema, así que se reportan aquí
+    const validDocs = docs.filter((doc) => {
+      const validationError = new Player(doc).validateSync();
+      if (validationError) errors.push({ name: doc.name, error: validationError.message });
+      return !validationError;
+    });
+
+    let savedPlayers = [];
+    try {
+      savedPlayers = await Player.insertMany(validDocs, { ordered: false, throwOnValidationError: true });
+    } catch (err) {
+      if (!err.writeErrors) throw err;
+      // ordered:false -> se insertan los válidos y se reportan los duplicados
+      savedPlayers = err.insertedDocs || [];
+      errors.push(
+        ...err.writeErrors.map((e) => {
+          // Mongoose reescribe cada writeError como { ...writeError, index }:
+          // code/errmsg del driver quedan solo dentro de e.err
+          const code = e.err?.code ?? e.code;
+          return {
+            name: validDocs[e.index]?.name,
+            error: code === 11000 ? "Ese jugador ya existe en ese equipo" : e.err?.errmsg ?? e.errmsg,
+          };
+        })
+      );
+    }
+
+    // Nada guardado: 409 si todo eran duplicados, 400 si hubo datos inválidos
+    let status = 201;
+    if (!savedPlayers.length && errors.length) {
+      const allDuplicates = errors.every((e) => e.error === "Ese jugador ya existe en ese equipo");
+      status = allDuplicates ? 409 : 400;
+    }
+
+    res.status(status).json({
+      message: "Jugadores procesados",
+      saved: savedPlayers.length,
+      total: players.length,
+      players: savedPlayers,
+      errors: errors.length ? errors : undefined,
+    });
+  } catch (error) {
+    console.error("❌ Error al crear jugadores masivos:", error.message);
+    res.status(500).json({ error: error.message });
+  }
+});
+
 app.get("/api/players", async (req, res) => {
   try {
     const { position, teamId } = req.query;
@@ -0,0 +1,107 @@
+from types import MappingProxyType
+
+# --------------------------------------------------
+# SELECCIONES CLASIFICADAS (COMPARTIDO POR scraper.py Y debug.py)
+# --------------------------------------------------
+# Estructuras de solo lectura: se construyen una vez al importar el módulo
+
+# Equipos clasificados manualmente (basados en información actualizada)
+EQUIPOS_CLASIFICADOS = tuple(MappingProxyType(team) for team in [
+    # Anfitriones (automáticos)
+    {"name": "Canada", "code": "CAN", "confederation": "CONCACAF"},
+    {"name": "Mexico", "code": "MEX", "confederation": "CONCACAF"},
+    {"name": "United States", "code": "USA", "confederation": "CONCACAF"},
+
+    # UEFA (Europa) - 12 clasificados
+    {"name": "England", "code": "ENG", "confederation": "UEFA"},
+    {"name": "France", "code": "FRA", "confederation": "UEFA"},
+    {"name": "Croatia", "code": "CRO", "confederation": "UEFA"},
+    {"name": "Norway", "code": "NOR", "confederation": "UEFA"},
+    {"name": "Portugal", "code": "POR", "confederation": "UEFA"},
+    {"name": "Germany", "code": "GER", "confederation": "UEFA"},
+    {"name": "Netherlands", "code": "NED", "confederation": "UEFA"},
+    {"name": "Switzerland", "code": "SUI", "confederation": "UEFA"},
+    {"name": "Scotland", "code": "SCO", "confederation": "UEFA"},
+    {"name": "Spain", "code": "ESP", "confederation": "UEFA"},
+    {"name": "Austria", "code": "AUT", "confederation": "UEFA"},
+    {"name": "Belgium", "code": "BEL", "confederation": "UEFA"},
+
+    # CONMEBOL (Sudamérica) - 6 clasificados
+    {"name": "Argentina", "code": "ARG", "confederation": "CONMEBOL"},
+    {"name": "Uruguay", "code": "URU", "confederation": "CONMEBOL"},
+    {"name": "Colombia", "code": "COL", "confederation": "CONMEBOL"},
+    {"name": "Brazil", "code": "BRA", "confederation": "CONMEBOL"},
+    {"name": "Ecuador", "code": "ECU", "confederation": "CONMEBOL"},
+    {"name": "Paraguay", "code": "PAR", "confederation": "CONMEBOL"},
+
+    # AFC (Asia) - 8 clasificados
+    {"name": "Japan", "code": "JPN", "confederation": "AFC"},
+    {"name": "Iran", "code": "IRN", "confederation": "AFC"},
+    {"name": "South Korea", "code": "KOR", "confederation": "AFC"},
+    {"name": "Australia", "code": "AUS", "confederation": "AFC"},
+    {"name": "Qatar", "code": "QAT", "confederation": "AFC"},
+    {"name": "Saudi Arabia", "code": "KSA", "confederation": "AFC"},
+    {"name": "Jordan", "code": "JOR", "confederation": "AFC"},
+    {"name": "Uzbekistan", "code": "UZB", "confederation": "AFC"},
+
+    # CAF (África) - 9 clasificados
+    {"name": "Morocco", "code": "MAR", "confederation": "CAF"},
+    {"name": "Senegal", "code": "SEN", "confederation": "CAF"},
+    {"name": "Egypt", "code": "EGY", "confederation": "CAF"},
+    {"name": "Algeria", "code": "ALG", "confederation": "CAF"},
+    {"name": "Cameroon", "code": "CMR", "confederation": "CAF"},
+    {"name": "Mali", "code": "MLI", "confederation": "CAF"},
+    {"name": "Ivory Coast", "code": "CIV", "confederation": "CAF"},
+    {"name": "Cape Verde", "code": "CPV", "confederation": "CAF"},
+    {"name": "Nigeria", "code": "NGA", "confederation": "CAF"},
+
+    # CONCACAF - 3 clasificados adicionales (anfitriones aparte)
+    {"name": "Panama", "code": "PAN", "confederation": "CONCACAF"},
+    {"name": "Haiti", "code": "HAI", "confederation": "CONCACAF"},
+    {"name": "Curacao", "code": "CUW", "confederation": "CONCACAF"},
+
+    # OFC (Oceanía) - 1 clasificado
+    {"name": "New Zealand", "code": "NZL", "confederation": "OFC"},
+])
+
+# Páginas de Wikipedia que no siguen "<Nombre>_national_football_team"
+_MAPEO_ESPECIAL = MappingProxyType({
+    "United States": "United_States_men's_national_soccer_team",
+    "England": "England_national_football_team",
+    "Scotland": "Scotland_national_football_team",
+    "Northern Ireland": "Northern_Ireland_national_football_team",
+    "Wales": "Wales_national_football_team",
+    "South Korea": "South_Korea_national_football_team",
+    "Ivory Coast": "Ivory_Coast_national_football_team",
+    "Cape Verde": "Cape_Verde_national_football_team",
+    "Saudi Arabia": "Saudi_Arabia_national_football_team",
+    "New Zealand": "New_Zealand_men's_national_football_team",
+    "China": "China_national_football_team",
+})
+
+
+def construir_url_wikipedia(nombre_equipo):
+    """
+    Construye la URL de Wikipedia para el equipo nacional.
+    Maneja algunos casos especiales como Estados Unidos, NZ, etc.
+    """
+    pagina = _MAPEO_ESPECIAL.get(
+        nombre_equipo, nombre_equipo.replace(" ", "_") + "_national_football_team"
+    )
+    return f"https://en.wikipedia.org/wiki/{pagina}"
+
+
+# --------------------------------------------------
+# POSICIONES (COMPARTIDO POR scraper.py Y debug.py)
+# --------------------------------------------------
+# Abreviatura/nombre (en mayúsculas) -> posición permitida por la API.
+# Cada script limpia el texto de la celda a su manera antes de buscarlo
+POSICIONES = MappingProxyType({
+    "GK": "GK", "GOALKEEPER": "GK",
+    "DF": "DF", "DEF": "DF", "DEFENDER": "DF",
+    "CB": "DF", "LB": "DF", "RB": "DF", "LWB": "DF", "RWB": "DF",
+    "MF": "MF", "MID": "MF", "MIDFIELDER": "MF",
+    "CM": "MF", "DM": "MF", "AM": "MF", "CDM": "MF", "CAM": "MF",
+    "FW": "FW", "FOR": "FW", "FORWARD": "FW", "ATT": "FW", "STRIKER": "FW",
+    "ST": "FW", "CF": "FW", "LW": "FW", "RW": "FW",
+})